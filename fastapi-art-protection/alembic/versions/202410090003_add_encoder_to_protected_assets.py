@@ -0,0 +1,33 @@
+"""record output encoder on protected assets"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "202410090003"
+down_revision = "202410090002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "protected_assets",
+        sa.Column("image_format", sa.String(length=16), nullable=True),
+    )
+    op.add_column(
+        "protected_assets",
+        sa.Column(
+            "encoder_options",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("protected_assets", "encoder_options")
+    op.drop_column("protected_assets", "image_format")
@@ -0,0 +1,47 @@
+"""add source hashes and idempotency key to protected assets"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "202410090004"
+down_revision = "202410090003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "protected_assets",
+        sa.Column("source_sha256", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "protected_assets",
+        sa.Column("source_phash", sa.String(length=64), nullable=True),
+    )
+    op.add_column(
+        "protected_assets",
+        sa.Column("idempotency_key", sa.String(length=255), nullable=True),
+    )
+    op.create_index(
+        "ix_protected_assets_source_sha256",
+        "protected_assets",
+        ["source_sha256"],
+    )
+    op.create_unique_constraint(
+        "uq_protected_assets_idempotency_key",
+        "protected_assets",
+        ["idempotency_key"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        "uq_protected_assets_idempotency_key", "protected_assets", type_="unique"
+    )
+    op.drop_index("ix_protected_assets_source_sha256", table_name="protected_assets")
+    op.drop_column("protected_assets", "idempotency_key")
+    op.drop_column("protected_assets", "source_phash")
+    op.drop_column("protected_assets", "source_sha256")
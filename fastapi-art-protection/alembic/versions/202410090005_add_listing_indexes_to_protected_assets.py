@@ -0,0 +1,31 @@
+"""add keyset pagination and metadata containment indexes"""
+
+from __future__ import annotations
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "202410090005"
+down_revision = "202410090004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_protected_assets_created_at_id",
+        "protected_assets",
+        ["created_at", "id"],
+    )
+    op.create_index(
+        "ix_protected_assets_user_metadata",
+        "protected_assets",
+        ["user_metadata"],
+        postgresql_using="gin",
+        postgresql_ops={"user_metadata": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_protected_assets_user_metadata", table_name="protected_assets")
+    op.drop_index("ix_protected_assets_created_at_id", table_name="protected_assets")
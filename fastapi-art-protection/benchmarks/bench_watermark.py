@@ -0,0 +1,113 @@
+"""Benchmarks for the watermark, hashing and DCT hot paths.
+
+Usage (from ``fastapi-art-protection``)::
+
+    python -m benchmarks.bench_watermark --output bench-results/watermark.json
+"""
+
+from __future__ import annotations
+
+import argparse
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+from services.watermark import (
+    _dct2,
+    compute_image_hashes,
+    compute_phash,
+    compute_phash_batch,
+    compute_sha256,
+    embed_invisible_watermark,
+)
+
+from .harness import measure, write_results
+
+DEFAULT_RESOLUTIONS = ["512x512", "1920x1080", "4000x3000"]
+WATERMARK_ID = "00000000-0000-4000-8000-000000000000"
+
+
+def synthetic_image(width: int, height: int, image_format: str, seed: int = 0) -> bytes:
+    """Deterministic gradient-plus-noise image so runs are comparable."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = (x + y) / 2
+    noise = rng.normal(scale=24.0, size=(height, width, 3)).astype(np.float32)
+    pixels = np.clip(base[..., None] + noise, 0, 255).astype(np.uint8)
+    buffer = BytesIO()
+    Image.fromarray(pixels, mode="RGB").save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def run(resolutions: List[Tuple[int, int]], repeat: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+
+    block = np.random.default_rng(0).random((32, 32), dtype=np.float32)
+    results["dct2_32x32"] = measure(lambda: _dct2(block), repeat=max(repeat, 1000))
+    stack = np.random.default_rng(0).random((256, 32, 32), dtype=np.float32)
+    results["dct2_32x32_batch256"] = measure(
+        lambda: _dct2(stack), repeat=max(repeat, 100), items_per_call=len(stack)
+    )
+
+    for width, height in resolutions:
+        label = f"{width}x{height}"
+        png = synthetic_image(width, height, "PNG")
+        jpeg = synthetic_image(width, height, "JPEG")
+        results[f"compute_sha256[{label}]"] = measure(
+            lambda: compute_sha256(png), repeat=repeat
+        )
+        results[f"compute_phash[png,{label}]"] = measure(
+            lambda: compute_phash(png), repeat=repeat
+        )
+        results[f"compute_phash[jpeg,{label}]"] = measure(
+            lambda: compute_phash(jpeg), repeat=repeat
+        )
+        results[f"compute_image_hashes[jpeg,{label}]"] = measure(
+            lambda: compute_image_hashes(jpeg), repeat=repeat
+        )
+        batch = [jpeg] * 8
+        results[f"compute_phash_batch[jpeg,{label},8]"] = measure(
+            lambda: compute_phash_batch(batch),
+            repeat=max(1, repeat // 4),
+            items_per_call=len(batch),
+        )
+        # Watermark embedding is orders of magnitude slower; keep its repeat small.
+        results[f"embed_invisible_watermark[{label}]"] = measure(
+            lambda: embed_invisible_watermark(jpeg, WATERMARK_ID),
+            repeat=max(1, repeat // 10),
+            warmup=1,
+        )
+    return results
+
+
+def _parse_resolution(value: str) -> Tuple[int, int]:
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--resolutions",
+        nargs="+",
+        default=DEFAULT_RESOLUTIONS,
+        help="Image sizes as WIDTHxHEIGHT",
+    )
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--output", type=Path, default=Path("bench-results/watermark.json")
+    )
+    args = parser.parse_args()
+
+    resolutions = [_parse_resolution(value) for value in args.resolutions]
+    results = run(resolutions, args.repeat)
+    write_results(args.output, "watermark", results)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Minimal timing harness shared by the benchmark scripts.
+
+Compare two result files with ``python -m benchmarks.harness BASE.json HEAD.json``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+
+def measure(
+    func: Callable[[], Any],
+    *,
+    repeat: int = 20,
+    warmup: int = 2,
+    items_per_call: int = 1,
+) -> Dict[str, float]:
+    """Time ``func`` and report throughput, latency percentiles and peak memory."""
+    for _ in range(warmup):
+        func()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocation-heavy code, so peak memory comes from one
+    # extra traced call rather than from the timed samples.
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    total = sum(samples)
+    return {
+        "repeat": repeat,
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p99_ms": _percentile(samples, 0.99) * 1000,
+        "throughput_per_s": (repeat * items_per_call) / total if total else 0.0,
+        "peak_memory_bytes": peak,
+    }
+
+
+def write_results(path: Path, suite: str, results: Dict[str, Any]) -> None:
+    """Persist results as JSON alongside enough context to compare branches."""
+    payload = {
+        "suite": suite,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True))
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+    # Nearest-rank percentile; adequate for the sample sizes used here.
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def _git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base_path: Path, head_path: Path) -> None:
+    """Print p50/p99 deltas for every benchmark present in both result files."""
+    base = json.loads(base_path.read_text())["results"]
+    head = json.loads(head_path.read_text())["results"]
+    print(f"{'benchmark':<48} {'p50 base':>10} {'p50 head':>10} {'p99 delta':>10}")
+    for name in sorted(base.keys() & head.keys()):
+        p99_delta = head[name]["p99_ms"] / base[name]["p99_ms"] - 1 if base[name]["p99_ms"] else 0.0
+        print(
+            f"{name:<48} {base[name]['p50_ms']:>10.3f} {head[name]['p50_ms']:>10.3f} "
+            f"{p99_delta:>+10.1%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    arguments = parser.parse_args()
+    compare(arguments.base, arguments.head)
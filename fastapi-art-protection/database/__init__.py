@@ -2,12 +2,25 @@
 
 from . import models  # noqa: F401 ensures models are registered with SQLAlchemy
 from .config import settings
-from .session import Base, SessionLocal, engine, get_db
+from .session import (
+    Base,
+    RoutingSession,
+    SessionLocal,
+    engine,
+    get_db,
+    get_read_db,
+    replica_engines,
+    warm_pool,
+)
 
 __all__ = [
     "settings",
     "Base",
+    "RoutingSession",
     "SessionLocal",
     "engine",
+    "replica_engines",
     "get_db",
+    "get_read_db",
+    "warm_pool",
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, String
+from sqlalchemy import Column, DateTime, Index, String
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from database.session import Base
@@ -11,6 +11,16 @@ from database.session import Base
 
 class ProtectedAsset(Base):
     __tablename__ = "protected_assets"
+    __table_args__ = (
+        # Keyset pagination walks (created_at, id); containment filters use the GIN index.
+        Index("ix_protected_assets_created_at_id", "created_at", "id"),
+        Index(
+            "ix_protected_assets_user_metadata",
+            "user_metadata",
+            postgresql_using="gin",
+            postgresql_ops={"user_metadata": "jsonb_path_ops"},
+        ),
+    )
 
     id = Column(
         UUID(as_uuid=True),
@@ -20,7 +30,12 @@ class ProtectedAsset(Base):
     encrypted_watermark_id = Column(String(512), nullable=False)
     sha256 = Column(String(64), nullable=False)
     phash = Column(String(64), nullable=False)
+    source_sha256 = Column(String(64), nullable=True, index=True)
+    source_phash = Column(String(64), nullable=True)
+    idempotency_key = Column(String(255), nullable=True, unique=True)
     user_metadata = Column(JSONB, nullable=True)
     google_drive_url = Column(String, nullable=True)
     image_link = Column(String, nullable=True)
+    image_format = Column(String(16), nullable=True)
+    encoder_options = Column(JSONB, nullable=True)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,4 +1,5 @@
-from typing import Generator
+import random
+from typing import Generator, List
 
 from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
@@ -6,8 +7,56 @@ from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from .config import settings
 
-engine: Engine = create_engine(settings.database_url, pool_pre_ping=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+def _create_engine(url: str) -> Engine:
+    # psycopg2 has no server-side prepared statements; statement reuse comes from
+    # SQLAlchemy's compiled-SQL cache, sized by DB_STATEMENT_CACHE_SIZE.
+    return create_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        query_cache_size=settings.db_statement_cache_size,
+    )
+
+
+engine: Engine = _create_engine(settings.database_url)
+replica_engines: List[Engine] = [
+    _create_engine(url) for url in settings.db_read_replica_urls
+]
+
+
+class RoutingSession(Session):
+    """Session that sends read-only work to a replica and everything else to the primary.
+
+    Sessions opened through ``get_read_db`` are marked read-only and pin one
+    replica for their lifetime so a request sees a consistent snapshot.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get("read_only") and replica_engines:
+            if "replica" not in self.info:
+                self.info["replica"] = random.choice(replica_engines)
+            return self.info["replica"]
+        return engine
+
+
+def warm_pool(target: Engine, connections: int) -> None:
+    """Open ``connections`` pooled connections up front so early requests skip the handshake."""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(target.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+SessionLocal = sessionmaker(
+    bind=engine, class_=RoutingSession, autoflush=False, autocommit=False
+)
 Base = declarative_base()
 
 
@@ -17,3 +66,12 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """Session for read-only endpoints; uses a replica when any are configured."""
+    db: Session = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
@@ -1,13 +1,22 @@
-from fastapi import Depends, FastAPI, HTTPException
+import base64
+import time
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from sqlalchemy import text
 
-from database import engine, get_db
+from database import engine, replica_engines, settings, warm_pool
 from routers import protection
+from services.crypto import encrypt_watermark_id
+from services.http_cache import ImmutableStaticFiles
+from services.metrics import STARTUP_DURATION, install_metrics
+from services.watermark import compute_phash
 
 
 ALLOWED_ORIGINS = ["http://localhost:5173"]
+WARMUP_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNgAAAAAgABSK+kcQAAAABJRU5ErkJggg=="
+)
 
 
 app = FastAPI()
@@ -18,8 +27,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", ImmutableStaticFiles(directory="static"), name="static")
 app.include_router(protection.router)
+install_metrics(app)
 
 @app.get("/")
 def read_root():
@@ -27,9 +37,10 @@ def read_root():
 
 
 @app.get("/healthz")
-def health_check(db=Depends(get_db)):
+def health_check():
     try:
-        db.execute(text("SELECT 1"))
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
     except Exception as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     return {"status": "ok"}
@@ -38,5 +49,28 @@ def health_check(db=Depends(get_db)):
 @app.on_event("startup")
 def setup_database():
     # Ensure the pgvector extension exists before serving requests; tables are managed by Alembic migrations.
+    # Deployments that run `alembic upgrade head` before rollout can skip this with RUN_STARTUP_DDL=false.
+    if not settings.run_startup_ddl:
+        return
+    started = time.perf_counter()
     with engine.begin() as connection:
         connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    STARTUP_DURATION.labels("ddl").set(time.perf_counter() - started)
+
+
+@app.on_event("startup")
+def warm_up():
+    """Pre-fill connection pools and exercise the image/crypto paths before taking traffic."""
+    if not settings.startup_warmup:
+        return
+    started = time.perf_counter()
+    for target in [engine, *replica_engines]:
+        warm_pool(target, settings.db_pool_size)
+    # A tiny PNG primes Pillow's plugin registry and the cached DCT basis.
+    compute_phash(WARMUP_PNG)
+    try:
+        encrypt_watermark_id("warmup")
+    except RuntimeError:
+        # Missing WATERMARK_ENCRYPTION_KEY should surface on first upload, not block startup.
+        pass
+    STARTUP_DURATION.labels("warmup").set(time.perf_counter() - started)
@@ -1,18 +1,53 @@
 from __future__ import annotations
 
 import base64
+import binascii
 import json
 import uuid
-from typing import Any, Dict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Literal, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse
 from pathlib import Path
+from sqlalchemy import Row, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from database import get_db
+from database import get_db, get_read_db, settings
 from database.models.protected_asset import ProtectedAsset
-from schemas import ProtectedAssetResponse, WatermarkDetectionResponse
+from schemas import (
+    ProtectedAssetPage,
+    ProtectedAssetResponse,
+    ProtectedAssetSummary,
+    WatermarkDetectionResponse,
+)
 from services.crypto import encrypt_watermark_id
+from services.derivatives import (
+    DERIVATIVE_MEDIA_TYPES,
+    DERIVATIVE_SIZES,
+    available_formats,
+    render_derivative,
+)
+from services.encoder import EncoderPolicy, select_encoder_policy
+from services.http_cache import IMMUTABLE_CACHE_CONTROL, etag_matches
+from services.metrics import timed
+from services.responses import json_response
 from services.watermark import compute_phash, compute_sha256, embed_invisible_watermark
 
 router = APIRouter(prefix="/protection", tags=["protection"])
@@ -22,6 +57,26 @@ STATIC_DIR = ROOT_DIR / "static"
 PROTECTED_DIR = STATIC_DIR / "protected"
 PROTECTED_DIR.mkdir(parents=True, exist_ok=True)
 STATIC_PROTECTED_URL = "/static/protected"
+DERIVATIVES_DIR = ROOT_DIR / "cache" / "derivatives"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+ASSET_PAGE_DEFAULT_LIMIT = 50
+ASSET_PAGE_MAX_LIMIT = 500
+
+NO_MATCH_MESSAGE = (
+    "No protected asset matched this file. "
+    "Upload the watermarked copy from /static/protected to detect."
+)
+MATCH_MESSAGE = "Image matches an existing protected asset."
+ASSET_PAYLOAD_FIELDS = (
+    "asset_id",
+    "encrypted_watermark_id",
+    "sha256",
+    "phash",
+    "image_link",
+    "google_drive_url",
+    "user_metadata",
+    "image_format",
+)
 
 SUPPORTED_IMAGE_TYPES = {
     "image/jpeg",
@@ -36,12 +91,23 @@ SUPPORTED_IMAGE_TYPES = {
     status_code=status.HTTP_201_CREATED,
 )
 async def upload_protected_image(
+    response: Response,
     image: UploadFile = File(...),
     metadata: str | None = Form(default=None, description="JSON encoded metadata"),
     google_drive_url: str | None = Form(None),
+    output_format: str | None = Form(
+        default=None, description="Output encoding: png or webp (defaults to settings)"
+    ),
+    idempotency_key: str | None = Header(
+        default=None, max_length=IDEMPOTENCY_KEY_MAX_LENGTH
+    ),
     db: Session = Depends(get_db),
-) -> ProtectedAssetResponse:
-    """Embed a watermark, store encrypted identifiers, and return the protected image."""
+) -> ProtectedAssetResponse | Response:
+    """Embed a watermark, store encrypted identifiers, and return the protected image.
+
+    Uploads are idempotent: a repeated ``Idempotency-Key`` or identical source
+    bytes return the existing asset with ``200`` instead of re-watermarking.
+    """
     if image.content_type not in SUPPORTED_IMAGE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -55,31 +121,126 @@ async def upload_protected_image(
             detail="Uploaded file is empty",
         )
 
+    # Validate every input before the dedup lookup so a replay can never mask a bad request.
     user_metadata = _parse_metadata(metadata)
-    watermark_id = str(uuid.uuid4())
+    try:
+        encoder = select_encoder_policy(raw_bytes, output_format)
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
 
-    watermarked_bytes = embed_invisible_watermark(raw_bytes, watermark_id)
-    sha256_digest = compute_sha256(watermarked_bytes)
-    phash_value = compute_phash(watermarked_bytes)
-    encrypted_identifier = encrypt_watermark_id(watermark_id)
-    encoded_image = base64.b64encode(watermarked_bytes).decode("utf-8")
-    file_name = f"{uuid.uuid4()}.png"
-    file_path = PROTECTED_DIR / file_name
-    file_path.write_bytes(watermarked_bytes)
-    image_link = f"{STATIC_PROTECTED_URL}/{file_name}"
+    source_sha256 = compute_sha256(raw_bytes)
+    fingerprint = _UploadFingerprint(
+        source_sha256=source_sha256,
+        image_format=encoder.extension,
+        user_metadata=user_metadata,
+        google_drive_url=google_drive_url,
+    )
+    existing = _find_existing_asset(db, idempotency_key, fingerprint)
+    if existing is not None:
+        return _replay_upload(existing, response)
+
+    # The pipeline is CPU-bound; running it off the event loop lets concurrent
+    # uploads encode in parallel (zlib and libwebp release the GIL).
+    protected = await run_in_threadpool(_protect_image, raw_bytes, encoder)
 
     asset = ProtectedAsset(
-        encrypted_watermark_id=encrypted_identifier,
-        sha256=sha256_digest,
-        phash=phash_value,
+        encrypted_watermark_id=protected.encrypted_identifier,
+        sha256=protected.sha256,
+        phash=protected.phash,
+        source_sha256=source_sha256,
+        source_phash=protected.source_phash,
+        idempotency_key=idempotency_key,
         user_metadata=user_metadata,
         google_drive_url=google_drive_url,
-        image_link=image_link,
+        image_link=protected.image_link,
+        image_format=encoder.extension,
+        encoder_options=encoder.options,
     )
     db.add(asset)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same Idempotency-Key won the race.
+        db.rollback()
+        _protected_file_path(protected.image_link).unlink(missing_ok=True)
+        existing = _find_existing_asset(db, idempotency_key, fingerprint)
+        if existing is None:
+            raise
+        return _replay_upload(existing, response)
     db.refresh(asset)
 
+    encoded_image = base64.b64encode(protected.watermarked_bytes).decode("utf-8")
+    return _upload_response(asset, encoded_image, status.HTTP_201_CREATED)
+
+
+@dataclass(frozen=True)
+class _UploadFingerprint:
+    """What an upload asked for; a stored asset is only reused if all of it matches."""
+
+    source_sha256: str
+    image_format: str
+    user_metadata: Dict[str, Any] | None
+    google_drive_url: str | None
+
+    def matches(self, asset: ProtectedAsset) -> bool:
+        return (
+            asset.source_sha256 == self.source_sha256
+            and asset.image_format == self.image_format
+            and asset.user_metadata == self.user_metadata
+            and asset.google_drive_url == self.google_drive_url
+        )
+
+
+def _find_existing_asset(
+    db: Session, idempotency_key: str | None, fingerprint: _UploadFingerprint
+) -> ProtectedAsset | None:
+    if idempotency_key is not None:
+        asset = (
+            db.query(ProtectedAsset)
+            .filter(ProtectedAsset.idempotency_key == idempotency_key)
+            .first()
+        )
+        if asset is not None:
+            if not fingerprint.matches(asset):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Idempotency-Key was already used for a different upload",
+                )
+            return asset
+    candidates = (
+        db.query(ProtectedAsset)
+        .filter(ProtectedAsset.source_sha256 == fingerprint.source_sha256)
+        .order_by(ProtectedAsset.created_at)
+        .all()
+    )
+    return next((asset for asset in candidates if fingerprint.matches(asset)), None)
+
+
+def _replay_upload(
+    asset: ProtectedAsset, response: Response
+) -> ProtectedAssetResponse | Response:
+    file_path = _protected_file_path(asset.image_link)
+    if not file_path.exists():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A matching asset exists but its protected file is missing",
+        )
+    encoded_image = base64.b64encode(file_path.read_bytes()).decode("utf-8")
+    response.status_code = status.HTTP_200_OK
+    return _upload_response(asset, encoded_image, status.HTTP_200_OK)
+
+
+def _upload_response(
+    asset: ProtectedAsset, encoded_image: str, status_code: int
+) -> ProtectedAssetResponse | Response:
+    if settings.fast_responses:
+        return json_response(
+            {**_asset_payload(asset), "watermarked_image_b64": encoded_image},
+            status_code=status_code,
+        )
+
     return ProtectedAssetResponse(
         asset_id=asset.id,
         encrypted_watermark_id=asset.encrypted_watermark_id,
@@ -88,10 +249,55 @@ async def upload_protected_image(
         image_link=asset.image_link,
         google_drive_url=asset.google_drive_url,
         user_metadata=asset.user_metadata,
+        image_format=asset.image_format,
         watermarked_image_b64=encoded_image,
     )
 
 
+def _protected_file_path(image_link: str | None) -> Path:
+    return PROTECTED_DIR / Path(image_link or "").name
+
+
+@dataclass
+class _ProtectedImage:
+    watermarked_bytes: bytes
+    sha256: str
+    phash: str
+    encrypted_identifier: str
+    image_link: str
+    source_phash: str
+
+
+def _protect_image(raw_bytes: bytes, encoder: EncoderPolicy) -> _ProtectedImage:
+    watermark_id = str(uuid.uuid4())
+    with timed("compute_phash"):
+        source_phash = compute_phash(raw_bytes)
+    with timed("embed_invisible_watermark"):
+        watermarked_bytes = embed_invisible_watermark(
+            raw_bytes,
+            watermark_id,
+            image_format=encoder.format,
+            save_options=encoder.options,
+        )
+    sha256_digest = compute_sha256(watermarked_bytes)
+    with timed("compute_phash"):
+        phash_value = compute_phash(watermarked_bytes)
+    with timed("encrypt_watermark_id"):
+        encrypted_identifier = encrypt_watermark_id(watermark_id)
+    file_name = f"{uuid.uuid4()}.{encoder.extension}"
+    file_path = PROTECTED_DIR / file_name
+    with timed("write_protected_file"):
+        file_path.write_bytes(watermarked_bytes)
+    return _ProtectedImage(
+        watermarked_bytes=watermarked_bytes,
+        sha256=sha256_digest,
+        phash=phash_value,
+        encrypted_identifier=encrypted_identifier,
+        image_link=f"{STATIC_PROTECTED_URL}/{file_name}",
+        source_phash=source_phash,
+    )
+
+
 def _parse_metadata(metadata: str | None) -> Dict[str, Any] | None:
     if metadata in (None, "", "null"):
         return None
@@ -117,8 +323,8 @@ def _parse_metadata(metadata: str | None) -> Dict[str, Any] | None:
 )
 async def detect_watermark(
     image: UploadFile = File(...),
-    db: Session = Depends(get_db),
-) -> WatermarkDetectionResponse:
+    db: Session = Depends(get_read_db),
+) -> WatermarkDetectionResponse | Response:
     """Determine whether an uploaded image matches a stored invisible/encrypted watermark."""
     if image.content_type not in SUPPORTED_IMAGE_TYPES:
         raise HTTPException(
@@ -141,14 +347,32 @@ async def detect_watermark(
     )
 
     if asset is None:
+        if settings.fast_responses:
+            return json_response(
+                {
+                    "watermark_detected": False,
+                    "invisible_watermark_detected": False,
+                    "encrypted_watermark_detected": False,
+                    **dict.fromkeys(ASSET_PAYLOAD_FIELDS),
+                    "message": NO_MATCH_MESSAGE,
+                }
+            )
         return WatermarkDetectionResponse(
             watermark_detected=False,
             invisible_watermark_detected=False,
             encrypted_watermark_detected=False,
-            message=(
-                "No protected asset matched this file. "
-                "Upload the watermarked copy from /static/protected to detect."
-            ),
+            message=NO_MATCH_MESSAGE,
+        )
+
+    if settings.fast_responses:
+        return json_response(
+            {
+                "watermark_detected": True,
+                "invisible_watermark_detected": True,
+                "encrypted_watermark_detected": True,
+                **_asset_payload(asset),
+                "message": MATCH_MESSAGE,
+            }
         )
 
     return WatermarkDetectionResponse(
@@ -162,5 +386,157 @@ async def detect_watermark(
         image_link=asset.image_link,
         google_drive_url=asset.google_drive_url,
         user_metadata=asset.user_metadata,
-        message="Image matches an existing protected asset.",
+        image_format=asset.image_format,
+        message=MATCH_MESSAGE,
+    )
+
+
+def _asset_payload(asset: ProtectedAsset) -> Dict[str, Any]:
+    """Response fields shared by upload and detection, for the fast response path."""
+    return {
+        "asset_id": asset.id,
+        "encrypted_watermark_id": asset.encrypted_watermark_id,
+        "sha256": asset.sha256,
+        "phash": asset.phash,
+        "image_link": asset.image_link,
+        "google_drive_url": asset.google_drive_url,
+        "user_metadata": asset.user_metadata,
+        "image_format": asset.image_format,
+    }
+
+
+@router.get("/assets", response_model=ProtectedAssetPage)
+def list_protected_assets(
+    limit: int = Query(default=ASSET_PAGE_DEFAULT_LIMIT, ge=1, le=ASSET_PAGE_MAX_LIMIT),
+    cursor: str | None = Query(
+        default=None, description="next_cursor from the previous page"
+    ),
+    metadata: str | None = Query(
+        default=None, description="JSON object the asset's metadata must contain"
+    ),
+    include_metadata: bool = Query(default=False),
+    db: Session = Depends(get_read_db),
+) -> ProtectedAssetPage | Response:
+    """Page through assets, newest first, using keyset pagination on (created_at, id).
+
+    Only summary columns are selected; ``user_metadata`` is loaded only when
+    ``include_metadata`` is set.
+    """
+    columns = [
+        ProtectedAsset.id,
+        ProtectedAsset.created_at,
+        ProtectedAsset.sha256,
+        ProtectedAsset.phash,
+        ProtectedAsset.image_link,
+        ProtectedAsset.image_format,
+    ]
+    if include_metadata:
+        columns.append(ProtectedAsset.user_metadata)
+
+    query = (
+        select(*columns)
+        .order_by(ProtectedAsset.created_at.desc(), ProtectedAsset.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        query = query.where(
+            tuple_(ProtectedAsset.created_at, ProtectedAsset.id)
+            < tuple_(*_decode_cursor(cursor))
+        )
+    metadata_filter = _parse_metadata(metadata)
+    if metadata_filter is not None:
+        # JSONB @> containment, served by the jsonb_path_ops GIN index.
+        query = query.where(ProtectedAsset.user_metadata.contains(metadata_filter))
+
+    rows = db.execute(query).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    items = [_summary_payload(row) for row in rows]
+    if settings.fast_responses:
+        return json_response({"items": items, "next_cursor": next_cursor})
+    return ProtectedAssetPage(
+        items=[ProtectedAssetSummary(**item) for item in items],
+        next_cursor=next_cursor,
+    )
+
+
+def _summary_payload(row: Row) -> Dict[str, Any]:
+    return {
+        "asset_id": row.id,
+        "created_at": row.created_at,
+        "sha256": row.sha256,
+        "phash": row.phash,
+        "image_link": row.image_link,
+        "image_format": row.image_format,
+        "user_metadata": getattr(row, "user_metadata", None),
+    }
+
+
+def _encode_cursor(created_at: datetime, asset_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{asset_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, asset_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(asset_id)
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+
+@router.get("/assets/{asset_id}/derivatives/{size}")
+def get_asset_derivative(
+    request: Request,
+    asset_id: UUID,
+    size: Literal["thumbnail", "preview"],
+    image_format: Literal["avif", "webp", "png", "jpeg"] = Query(
+        default="webp", alias="format"
+    ),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_read_db),
+) -> Response:
+    """Serve a cached, downscaled copy of a protected image.
+
+    Derivatives are rendered on first request and cached on disk per asset,
+    size and format. Requests for AVIF are redirected to WebP when this Pillow
+    build cannot encode it.
+    """
+    if image_format not in available_formats():
+        # Redirect rather than serve WebP under the AVIF URL: the immutable
+        # caching would pin the fallback there long after AVIF becomes available.
+        return RedirectResponse(
+            str(request.url.include_query_params(format="webp")),
+            status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+        )
+
+    asset = db.get(ProtectedAsset, asset_id)
+    if asset is None or not asset.image_link:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+
+    # The source file never changes, so its digest plus the variant is a strong validator.
+    etag = f'"{asset.sha256}-{size}.{image_format}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    target = DERIVATIVES_DIR / str(asset.id) / f"{size}.{image_format}"
+    if not target.exists():
+        source = _protected_file_path(asset.image_link)
+        if not source.exists():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Protected file is missing"
+            )
+        with timed("render_derivative"):
+            render_derivative(source, target, DERIVATIVE_SIZES[size], image_format)
+
+    # FileResponse handles Range requests and keeps the ETag set here.
+    return FileResponse(
+        target, media_type=DERIVATIVE_MEDIA_TYPES[image_format], headers=headers
     )
@@ -1,6 +1,13 @@
-from .protected_asset import ProtectedAssetResponse, WatermarkDetectionResponse
+from .protected_asset import (
+    ProtectedAssetPage,
+    ProtectedAssetResponse,
+    ProtectedAssetSummary,
+    WatermarkDetectionResponse,
+)
 
 __all__ = [
+    "ProtectedAssetPage",
     "ProtectedAssetResponse",
+    "ProtectedAssetSummary",
     "WatermarkDetectionResponse",
 ]
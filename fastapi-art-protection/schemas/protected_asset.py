@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from datetime import datetime
+from typing import Any, Dict, List
 from uuid import UUID
 
 from pydantic import AnyHttpUrl, BaseModel
@@ -14,6 +15,7 @@ class ProtectedAssetResponse(BaseModel):
     image_link: str | None = None
     google_drive_url: AnyHttpUrl | None = None
     user_metadata: Dict[str, Any] | None = None
+    image_format: str | None = None
     watermarked_image_b64: str
 
 
@@ -28,4 +30,20 @@ class WatermarkDetectionResponse(BaseModel):
     image_link: str | None = None
     google_drive_url: AnyHttpUrl | None = None
     user_metadata: Dict[str, Any] | None = None
+    image_format: str | None = None
     message: str
+
+
+class ProtectedAssetSummary(BaseModel):
+    asset_id: UUID
+    created_at: datetime
+    sha256: str
+    phash: str
+    image_link: str | None = None
+    image_format: str | None = None
+    user_metadata: Dict[str, Any] | None = None
+
+
+class ProtectedAssetPage(BaseModel):
+    items: List[ProtectedAssetSummary]
+    next_cursor: str | None = None
@@ -1,3 +1,15 @@
-from .embeddings import embed_text
+from __future__ import annotations
+
+from typing import Any
 
 __all__ = ["embed_text"]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve lazily: importing services.watermark/crypto must not pull in the
+    # Gemini SDK, which no art-protection route uses.
+    if name == "embed_text":
+        from .embeddings import embed_text
+
+        return embed_text
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
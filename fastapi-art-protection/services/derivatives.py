@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Set
+
+from PIL import Image
+
+# Named derivative sizes: longest side in pixels.
+DERIVATIVE_SIZES: Dict[str, int] = {
+    "thumbnail": 256,
+    "preview": 1024,
+}
+DERIVATIVE_MEDIA_TYPES: Dict[str, str] = {
+    "avif": "image/avif",
+    "webp": "image/webp",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+_SAVE_OPTIONS: Dict[str, Dict[str, object]] = {
+    "avif": {"quality": 60},
+    "webp": {"quality": 80, "method": 4},
+    "png": {"compress_level": 6},
+    "jpeg": {"quality": 85, "optimize": True},
+}
+
+
+@lru_cache(maxsize=1)
+def available_formats() -> Set[str]:
+    """Derivative formats this Pillow build can encode (AVIF needs Pillow 11.3+ with libavif)."""
+    Image.init()
+    return {name for name in DERIVATIVE_MEDIA_TYPES if name.upper() in Image.SAVE}
+
+
+def render_derivative(source: Path, target: Path, max_side: int, image_format: str) -> None:
+    """Write a downscaled copy of ``source`` to ``target`` atomically."""
+    with Image.open(source) as image:
+        image.draft("RGB", (max_side, max_side))
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        if image_format == "jpeg" and image.mode == "RGBA":
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a sibling temp file and rename so concurrent readers never see partial files.
+        fd, temp_name = tempfile.mkstemp(dir=target.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                image.save(handle, format=image_format.upper(), **_SAVE_OPTIONS[image_format])
+            os.replace(temp_name, target)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any, Dict
+
+from PIL import Image
+
+from database import settings
+
+SUPPORTED_OUTPUT_FORMATS = {"png", "webp"}
+
+
+@dataclass(frozen=True)
+class EncoderPolicy:
+    """How a protected image is encoded; persisted on the asset for auditing."""
+
+    format: str
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def extension(self) -> str:
+        return self.format.lower()
+
+
+def select_encoder_policy(
+    image_bytes: bytes, requested_format: str | None = None
+) -> EncoderPolicy:
+    """Pick the output encoder from the request, settings and the image's size class.
+
+    Only the image header is read here, so the choice costs no pixel decoding.
+    """
+    output_format = (requested_format or settings.protected_image_format).lower()
+    if output_format not in SUPPORTED_OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported output format: {output_format}")
+
+    if output_format == "webp":
+        return EncoderPolicy(
+            format="WEBP",
+            options={
+                "lossless": True,
+                # For lossless WebP, quality is the compression effort (0-100).
+                "quality": settings.webp_lossless_effort,
+                "method": settings.webp_method,
+            },
+        )
+
+    with Image.open(BytesIO(image_bytes)) as image:
+        width, height = image.size
+    is_large = width * height >= settings.large_image_pixels
+    compress_level = (
+        settings.png_large_compress_level if is_large else settings.png_compress_level
+    )
+    return EncoderPolicy(format="PNG", options={"compress_level": compress_level})
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from fastapi.staticfiles import StaticFiles
+
+# Protected files and derivatives are content-addressed by asset id and never
+# rewritten, so clients and CDNs may cache them indefinitely.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that marks every served file as immutable."""
+
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers.setdefault("Cache-Control", IMMUTABLE_CACHE_CONTROL)
+        return response
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    """Encode ``content`` with orjson (NumPy-aware), skipping response-model validation."""
+    return Response(
+        orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY),
+        status_code=status_code,
+        media_type="application/json",
+    )
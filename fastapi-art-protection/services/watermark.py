@@ -2,18 +2,42 @@ from __future__ import annotations
 
 import hashlib
 import math
+from dataclasses import dataclass
 from functools import lru_cache
 from io import BytesIO
-from typing import Iterable, List
+from typing import Any, Iterable, List, Mapping, Sequence
 
 import numpy as np
 from PIL import Image
 
+PHASH_BLOCK_SIZE = 32
+HASH_SIZE = 8
+# Decode/reduce to this multiple of the block size before the final LANCZOS
+# resize so downsampling quality stays close to a full-resolution resize.
+_THUMBNAIL_HEADROOM = 4
+_REDUCIBLE_MODES = {"L", "LA", "RGB", "RGBA", "CMYK", "YCbCr"}
+
+
+@dataclass(frozen=True)
+class ImageHashes:
+    phash: str
+    ahash: str
+    dhash: str
+
 
 def embed_invisible_watermark(
-    image_bytes: bytes, watermark_id: str, *, strength: float = 3.0
+    image_bytes: bytes,
+    watermark_id: str,
+    *,
+    strength: float = 3.0,
+    image_format: str = "PNG",
+    save_options: Mapping[str, Any] | None = None,
 ) -> bytes:
-    """Embed a spread-spectrum style watermark into the luminance channel."""
+    """Embed a spread-spectrum style watermark into the luminance channel.
+
+    The result is encoded as ``image_format`` with Pillow ``save_options``
+    (e.g. PNG ``compress_level`` or lossless WebP settings).
+    """
     if not image_bytes:
         raise ValueError("image_bytes cannot be empty")
 
@@ -46,7 +70,7 @@ def embed_invisible_watermark(
     ).convert("RGB")
 
     buffer = BytesIO()
-    watermarked_image.save(buffer, format="PNG")
+    watermarked_image.save(buffer, format=image_format, **(save_options or {}))
     return buffer.getvalue()
 
 
@@ -56,16 +80,65 @@ def compute_sha256(data: bytes) -> str:
 
 def compute_phash(image_bytes: bytes) -> str:
     """Compute a perceptual hash using a DCT-based pHash implementation."""
-    with Image.open(BytesIO(image_bytes)) as image:
-        grayscale = image.convert("L").resize((32, 32), Image.Resampling.LANCZOS)
-        matrix = np.asarray(grayscale, dtype=np.float32)
+    return compute_phash_batch([image_bytes])[0]
+
+
+def compute_phash_batch(images: Sequence[bytes]) -> List[str]:
+    """pHash many images with a single stacked DCT over their 32x32 thumbnails."""
+    if not images:
+        return []
+    blocks = np.stack(
+        [np.asarray(_hash_thumbnail(image), dtype=np.float32) for image in images]
+    )
+    return _phash_from_blocks(blocks)
 
-    dct_matrix = _dct2(matrix)
-    low_freq = dct_matrix[:8, :8].copy()
-    low_freq[0, 0] = 0  # Ignore the DC component
-    median = np.median(low_freq)
-    bits = (low_freq > median).astype(int).flatten()
-    return _bits_to_hex(bits)
+
+def compute_image_hashes(image_bytes: bytes) -> ImageHashes:
+    """Compute pHash, aHash and dHash from one reduced-resolution decode."""
+    thumbnail = _hash_thumbnail(image_bytes)
+    block = np.asarray(thumbnail, dtype=np.float32)
+
+    scale = PHASH_BLOCK_SIZE // HASH_SIZE
+    means = block.reshape(HASH_SIZE, scale, HASH_SIZE, scale).mean(axis=(1, 3))
+    ahash_bits = (means > means.mean()).flatten()
+
+    gradient = np.asarray(
+        thumbnail.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.BOX),
+        dtype=np.float32,
+    )
+    dhash_bits = (gradient[:, 1:] > gradient[:, :-1]).flatten()
+
+    return ImageHashes(
+        phash=_phash_from_blocks(block[np.newaxis])[0],
+        ahash=_bits_to_hex(ahash_bits),
+        dhash=_bits_to_hex(dhash_bits),
+    )
+
+
+def _hash_thumbnail(image_bytes: bytes) -> Image.Image:
+    """Grayscale 32x32 thumbnail, decoding as little of the image as possible."""
+    target = PHASH_BLOCK_SIZE * _THUMBNAIL_HEADROOM
+    with Image.open(BytesIO(image_bytes)) as image:
+        # JPEG decodes straight to grayscale at 1/2, 1/4 or 1/8 scale; no-op otherwise.
+        image.draft("L", (target, target))
+        image.load()
+        if image.mode not in _REDUCIBLE_MODES:
+            image = image.convert("L")
+        factor = min(image.size) // target
+        if factor > 1:
+            image = image.reduce(factor)
+        return image.convert("L").resize(
+            (PHASH_BLOCK_SIZE, PHASH_BLOCK_SIZE), Image.Resampling.LANCZOS
+        )
+
+
+def _phash_from_blocks(blocks: np.ndarray) -> List[str]:
+    dct_blocks = _dct2(blocks)
+    low_freq = dct_blocks[:, :HASH_SIZE, :HASH_SIZE].copy()
+    low_freq[:, 0, 0] = 0  # Ignore the DC component
+    medians = np.median(low_freq, axis=(1, 2), keepdims=True)
+    bits = (low_freq > medians).reshape(len(blocks), -1)
+    return [_bits_to_hex(row) for row in bits]
 
 
 def _watermark_bits(watermark_id: str) -> List[int]:
@@ -98,7 +171,8 @@ def _dct_basis(size: int) -> np.ndarray:
 
 
 def _dct2(block: np.ndarray) -> np.ndarray:
-    if block.shape[0] != block.shape[1]:
+    """2-D DCT of a square block, or of every block in an ``(n, size, size)`` stack."""
+    if block.shape[-1] != block.shape[-2]:
         raise ValueError("Only square matrices are supported for pHash computation")
-    basis = _dct_basis(block.shape[0])
+    basis = _dct_basis(block.shape[-1])
     return basis @ block @ basis.T
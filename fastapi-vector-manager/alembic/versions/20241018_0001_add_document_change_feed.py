@@ -0,0 +1,89 @@
+"""add document versions, tombstones and change notifications"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "20241018_0001"
+down_revision = "34af88038b57"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE IF NOT EXISTS documents_version_seq")
+    op.add_column(
+        "documents",
+        sa.Column(
+            "updated_at",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())"),
+        ),
+    )
+    # nextval() is volatile, so existing rows each receive their own version.
+    op.add_column(
+        "documents",
+        sa.Column(
+            "version",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("nextval('documents_version_seq')"),
+        ),
+    )
+    op.create_index("ix_documents_version", "documents", ["version"])
+
+    op.create_table(
+        "document_tombstones",
+        sa.Column("document_id", sa.Integer(), nullable=False),
+        sa.Column(
+            "version",
+            sa.BigInteger(),
+            nullable=False,
+            server_default=sa.text("nextval('documents_version_seq')"),
+        ),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("document_id"),
+    )
+    op.create_index(
+        "ix_document_tombstones_version", "document_tombstones", ["version"]
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_document_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('document_changes', NEW.version::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER documents_notify_change
+        AFTER INSERT OR UPDATE ON documents
+        FOR EACH ROW EXECUTE FUNCTION notify_document_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER document_tombstones_notify_change
+        AFTER INSERT OR UPDATE ON document_tombstones
+        FOR EACH ROW EXECUTE FUNCTION notify_document_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "DROP TRIGGER IF EXISTS document_tombstones_notify_change ON document_tombstones"
+    )
+    op.execute("DROP TRIGGER IF EXISTS documents_notify_change ON documents")
+    op.execute("DROP FUNCTION IF EXISTS notify_document_change()")
+    op.drop_index("ix_document_tombstones_version", table_name="document_tombstones")
+    op.drop_table("document_tombstones")
+    op.drop_index("ix_documents_version", table_name="documents")
+    op.drop_column("documents", "version")
+    op.drop_column("documents", "updated_at")
+    op.execute("DROP SEQUENCE IF EXISTS documents_version_seq")
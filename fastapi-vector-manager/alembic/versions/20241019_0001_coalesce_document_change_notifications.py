@@ -0,0 +1,63 @@
+"""send one change notification per statement with a constant payload"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "20241019_0001"
+down_revision = "20241018_0001"
+branch_labels = None
+depends_on = None
+
+_TABLES = (
+    ("documents_notify_change", "documents"),
+    ("document_tombstones_notify_change", "document_tombstones"),
+)
+
+
+def upgrade() -> None:
+    # Listeners only need a wake-up and re-read the feed themselves. An empty
+    # payload lets Postgres fold repeats within a transaction into one
+    # notification, and statement triggers fire once per bulk write.
+    for trigger, table in _TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_document_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('document_changes', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for trigger, table in _TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER INSERT OR UPDATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_document_change()
+            """
+        )
+
+
+def downgrade() -> None:
+    for trigger, table in _TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table}")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_document_change() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('document_changes', NEW.version::text);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for trigger, table in _TABLES:
+        op.execute(
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION notify_document_change()
+            """
+        )
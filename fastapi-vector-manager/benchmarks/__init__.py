@@ -0,0 +1 @@
+"""Benchmark suites; run from the service root with ``python -m benchmarks.<suite>``."""
@@ -0,0 +1,74 @@
+"""Import-time profile of ``main`` to track cold-start cost per worker.
+
+Usage (from the service root)::
+
+    python -m benchmarks.import_profile --output bench-results/import_profile.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .harness import write_results
+
+SERVICE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def profile_imports(module: str = "main") -> List[Dict[str, Any]]:
+    """Run ``python -X importtime`` in a fresh interpreter and parse its report."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries: List[Dict[str, Any]] = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        entries.append(
+            {
+                "module": name.strip(),
+                # Nesting depth is encoded as two spaces per level in the report.
+                "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cumulative_us) / 1000,
+            }
+        )
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument(
+        "--output", type=Path, default=Path("bench-results/import_profile.json")
+    )
+    args = parser.parse_args()
+
+    entries = profile_imports(args.module)
+    total = next(
+        (entry["cumulative_ms"] for entry in entries if entry["module"] == args.module),
+        sum(entry["self_ms"] for entry in entries),
+    )
+    slowest = sorted(entries, key=lambda entry: entry["cumulative_ms"], reverse=True)
+    results = {
+        "total_import_ms": total,
+        "module_count": len(entries),
+        "slowest": slowest[: args.top],
+    }
+    write_results(args.output, "import_profile", results)
+    for entry in slowest[: args.top]:
+        print(f"{entry['cumulative_ms']:>10.1f} ms  {entry['module']}")
+    print(f"import {args.module}: {total:.1f} ms total")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,29 @@
 """Convenience exports for the database package."""
 
 from .config import settings
-from .models import Document
-from .session import Base, SessionLocal, engine, get_db
+from .models import Document, DocumentTombstone, Float32Vector
+from .session import (
+    Base,
+    RoutingSession,
+    SessionLocal,
+    engine,
+    get_db,
+    get_read_db,
+    replica_engines,
+    warm_pool,
+)
 
 __all__ = [
     "settings",
     "Document",
+    "DocumentTombstone",
+    "Float32Vector",
     "Base",
+    "RoutingSession",
     "SessionLocal",
     "engine",
+    "replica_engines",
     "get_db",
+    "get_read_db",
+    "warm_pool",
 ]
@@ -1,5 +1,6 @@
 """Database model package exports."""
 
-from .document import Document
+from .document import DOCUMENT_VERSION_SEQUENCE, Document, Float32Vector
+from .document_tombstone import DocumentTombstone
 
-__all__ = ["Document"]
+__all__ = ["DOCUMENT_VERSION_SEQUENCE", "Document", "DocumentTombstone", "Float32Vector"]
@@ -1,10 +1,40 @@
 """Document model."""
 
+from datetime import datetime
+
+import numpy as np
 from pgvector.sqlalchemy import Vector
-from sqlalchemy import Column, Integer, String, Text, JSON
+from sqlalchemy import BigInteger, Column, DateTime, Integer, Sequence, String, Text, JSON, text
+from sqlalchemy.types import UserDefinedType
 
 from ..session import Base
 
+# Shared by documents and tombstones so every change gets a position in one
+# monotonically increasing change feed.
+DOCUMENT_VERSION_SEQUENCE = Sequence("documents_version_seq", metadata=Base.metadata)
+
+
+class Float32Vector(UserDefinedType):
+    """Result type that parses pgvector's text output straight into a float32 ndarray.
+
+    Apply with ``type_coerce(Document.embedding, Float32Vector())`` on hot read
+    paths; it skips building a Python float per element.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw) -> str:
+        return "vector"
+
+    def result_processor(self, dialect, coltype):
+        def process(value):
+            if value is None:
+                return None
+            # Text form is "[x,y,...]"; pgvector stores float4, so float32 is lossless.
+            return np.fromstring(value[1:-1], dtype=np.float32, sep=",")
+
+        return process
+
 
 class Document(Base):
     __tablename__ = "documents"
@@ -14,6 +44,20 @@ class Document(Base):
     content = Column(Text, nullable=False)
     metadata_json = Column("metadata", JSON, nullable=True)
     embedding = Column(Vector(768), nullable=False)
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=text("timezone('utc', now())"),
+    )
+    version = Column(
+        BigInteger,
+        nullable=False,
+        index=True,
+        server_default=DOCUMENT_VERSION_SEQUENCE.next_value(),
+        onupdate=DOCUMENT_VERSION_SEQUENCE.next_value(),
+    )
 
 
 Document.metadata = property(  # type: ignore[attr-defined]
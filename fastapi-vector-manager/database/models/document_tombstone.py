@@ -0,0 +1,21 @@
+"""Tombstones recording deleted documents for the change feed."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+
+from ..session import Base
+from .document import DOCUMENT_VERSION_SEQUENCE
+
+
+class DocumentTombstone(Base):
+    __tablename__ = "document_tombstones"
+
+    document_id = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(
+        BigInteger,
+        nullable=False,
+        index=True,
+        server_default=DOCUMENT_VERSION_SEQUENCE.next_value(),
+    )
+    deleted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
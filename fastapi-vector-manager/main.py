@@ -1,9 +1,14 @@
-from fastapi import Depends, FastAPI, HTTPException
+import time
+
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
-from database import engine, get_db
+from database import engine, replica_engines, settings, warm_pool
 from routers import documents_router
+from services import get_embedding_client
+from services.change_feed import change_hub
+from services.metrics import STARTUP_DURATION, install_metrics
 
 
 ALLOWED_ORIGINS = ["http://localhost:5173"]
@@ -18,6 +23,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 app.include_router(documents_router)
+install_metrics(app)
 
 
 @app.get("/")
@@ -26,9 +32,10 @@ def read_root():
 
 
 @app.get("/healthz")
-def health_check(db=Depends(get_db)):
+def health_check():
     try:
-        db.execute(text("SELECT 1"))
+        with engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
     except Exception as exc:
         raise HTTPException(status_code=503, detail=str(exc)) from exc
     return {"status": "ok"}
@@ -37,5 +44,31 @@ def health_check(db=Depends(get_db)):
 @app.on_event("startup")
 def setup_database():
     # Ensure the pgvector extension exists before serving requests; tables are managed by Alembic migrations.
+    # Deployments that run `alembic upgrade head` before rollout can skip this with RUN_STARTUP_DDL=false.
+    if not settings.run_startup_ddl:
+        return
+    started = time.perf_counter()
     with engine.begin() as connection:
         connection.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    STARTUP_DURATION.labels("ddl").set(time.perf_counter() - started)
+
+
+@app.on_event("startup")
+def warm_up():
+    """Pre-fill connection pools and build the embedding client before taking traffic."""
+    if not settings.startup_warmup:
+        return
+    started = time.perf_counter()
+    for target in [engine, *replica_engines]:
+        warm_pool(target, settings.db_pool_size)
+    try:
+        get_embedding_client()
+    except RuntimeError:
+        # A misconfigured provider should surface on first use, not block startup.
+        pass
+    STARTUP_DURATION.labels("warmup").set(time.perf_counter() - started)
+
+
+@app.on_event("shutdown")
+def close_change_listener():
+    change_hub.close()
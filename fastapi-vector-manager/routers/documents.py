@@ -1,21 +1,75 @@
-from typing import List
+from typing import Any, AsyncIterator, Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row, select, type_coerce
 from sqlalchemy.orm import Session
 
-from database import Document, get_db
-from schemas import DocumentCreate, DocumentRead, DocumentUpdate
+from database import (
+    Document,
+    DocumentTombstone,
+    Float32Vector,
+    SessionLocal,
+    get_db,
+    get_read_db,
+    settings,
+)
+from schemas import DocumentChangesPage, DocumentCreate, DocumentRead, DocumentUpdate
 from services import embed_text
+from services.change_feed import (
+    ChangeStreamLimitError,
+    change_hub,
+    load_changes,
+    lock_change_feed,
+)
+from services.corpus import (
+    EXPORT_MEDIA_TYPES,
+    ArrowFormat,
+    import_documents,
+    stream_arrow_export,
+)
+from services.metrics import timed
+from services.responses import json_response
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
+# Columns read by the fast response path; rows are encoded without building ORM
+# objects or running DocumentRead validation. Embeddings arrive as float32
+# ndarrays, which orjson encodes natively.
+_DOCUMENT_COLUMNS = (
+    Document.id,
+    Document.title,
+    Document.content,
+    Document.metadata_json,
+    type_coerce(Document.embedding, Float32Vector()).label("embedding"),
+    Document.version,
+    Document.updated_at,
+)
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 5000
+# Seconds between SSE keep-alive comments while no changes arrive.
+CHANGE_STREAM_KEEPALIVE_SECONDS = 15.0
+
 
 @router.post("/", response_model=DocumentRead, status_code=status.HTTP_201_CREATED)
 def create_document(
     document_in: DocumentCreate, db: Session = Depends(get_db)
 ) -> DocumentRead:
     try:
-        embedding = embed_text(document_in.content)
+        with timed("embed_text"):
+            embedding = embed_text(document_in.content)
     except RuntimeError as exc:
         raise HTTPException(
             status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)
@@ -27,6 +81,7 @@ def create_document(
         metadata=document_in.metadata,
         embedding=embedding,
     )
+    lock_change_feed(db)
     db.add(document)
     db.commit()
     db.refresh(document)
@@ -34,12 +89,95 @@ def create_document(
 
 
 @router.get("/", response_model=List[DocumentRead])
-def list_documents(db: Session = Depends(get_db)) -> List[DocumentRead]:
+def list_documents(
+    db: Session = Depends(get_read_db),
+) -> List[DocumentRead] | Response:
+    if settings.fast_responses:
+        rows = db.execute(select(*_DOCUMENT_COLUMNS)).all()
+        return json_response([_row_payload(row) for row in rows])
     return db.query(Document).all()
 
 
+@router.get("/changes", response_model=DocumentChangesPage)
+def list_document_changes(
+    since: int = Query(default=0, ge=0, description="next_cursor from the previous page"),
+    limit: int = Query(default=CHANGES_DEFAULT_LIMIT, ge=1, le=CHANGES_MAX_LIMIT),
+    db: Session = Depends(get_read_db),
+) -> DocumentChangesPage:
+    """Documents created, updated or deleted after ``since``, in version order."""
+    return load_changes(db, since, limit)
+
+
+@router.get("/changes/stream")
+async def stream_document_changes(
+    request: Request,
+    since: int = Query(default=0, ge=0),
+    last_event_id: int | None = Header(default=None),
+) -> StreamingResponse:
+    """Server-Sent Events stream of changes, woken by Postgres LISTEN/NOTIFY.
+
+    Reconnecting clients resume from the ``Last-Event-ID`` header.
+    """
+    if change_hub.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many open change streams",
+        )
+    start = max(since, last_event_id or 0)
+    return StreamingResponse(
+        _change_events(request, start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/export")
+def export_documents(
+    export_format: ArrowFormat = Query(default="parquet", alias="format"),
+) -> StreamingResponse:
+    """Stream the whole corpus as Parquet or Arrow IPC, read via a server-side cursor."""
+    try:
+        chunks = stream_arrow_export(export_format)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)) from exc
+    extension = "parquet" if export_format == "parquet" else "arrows"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="documents.{extension}"'},
+    )
+
+
+@router.post("/import")
+def import_document_file(
+    file: UploadFile = File(...),
+    import_format: ArrowFormat = Query(default="parquet", alias="format"),
+    db: Session = Depends(get_db),
+) -> Dict[str, int]:
+    """Upsert documents from a Parquet/Arrow export using COPY into a staging table."""
+    try:
+        imported = import_documents(db, file.file, import_format)
+    except RuntimeError as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=str(exc)) from exc
+    except (ValueError, KeyError) as exc:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return {"imported": imported}
+
+
 @router.get("/{document_id}", response_model=DocumentRead)
-def get_document(document_id: int, db: Session = Depends(get_db)) -> DocumentRead:
+def get_document(
+    document_id: int, db: Session = Depends(get_read_db)
+) -> DocumentRead | Response:
+    if settings.fast_responses:
+        row = db.execute(
+            select(*_DOCUMENT_COLUMNS).where(Document.id == document_id)
+        ).first()
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        return json_response(_row_payload(row))
+
     document = db.get(Document, document_id)
     if document is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
@@ -59,7 +197,8 @@ def update_document(
     if document_in.content is not None:
         document.content = document_in.content
         try:
-            document.embedding = embed_text(document.content)
+            with timed("embed_text"):
+                document.embedding = embed_text(document.content)
         except RuntimeError as exc:
             raise HTTPException(
                 status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)
@@ -67,6 +206,7 @@ def update_document(
     if "metadata" in document_in.model_fields_set:
         document.metadata = document_in.metadata
 
+    lock_change_feed(db)
     db.add(document)
     db.commit()
     db.refresh(document)
@@ -79,5 +219,53 @@ def delete_document(document_id: int, db: Session = Depends(get_db)) -> None:
     if document is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
 
+    lock_change_feed(db)
     db.delete(document)
+    db.add(DocumentTombstone(document_id=document_id))
     db.commit()
+
+
+def _row_payload(row: Row) -> Dict[str, Any]:
+    return {
+        "id": row.id,
+        "title": row.title,
+        "content": row.content,
+        "metadata": row.metadata_json,
+        "embedding": row.embedding,
+        "version": row.version,
+        "updated_at": row.updated_at,
+    }
+
+
+def _load_changes_page(since: int) -> DocumentChangesPage:
+    # Read from the primary: notifications come from it and a lagging replica
+    # would make the stream miss the change that woke it.
+    with SessionLocal() as db:
+        return load_changes(db, since, CHANGES_DEFAULT_LIMIT)
+
+
+async def _change_events(request: Request, since: int) -> AsyncIterator[str]:
+    # Subscribe (LISTEN) before the catch-up read so no notification can slip in between.
+    try:
+        wakeup = await change_hub.subscribe()
+    except ChangeStreamLimitError:
+        # Lost the race for the last slot after the endpoint's check.
+        return
+    cursor = since
+    try:
+        while not await request.is_disconnected():
+            has_more = True
+            while has_more:
+                page = await run_in_threadpool(_load_changes_page, cursor)
+                for change in page.changes:
+                    yield (
+                        f"id: {change.version}\nevent: change\n"
+                        f"data: {change.model_dump_json()}\n\n"
+                    )
+                cursor, has_more = page.next_cursor, page.has_more
+
+            notified = await change_hub.wait(wakeup, CHANGE_STREAM_KEEPALIVE_SECONDS)
+            if not notified:
+                yield ": keep-alive\n\n"
+    finally:
+        change_hub.unsubscribe(wakeup)
@@ -1,3 +1,15 @@
-from .document import DocumentCreate, DocumentRead, DocumentUpdate
+from .document import (
+    DocumentChange,
+    DocumentChangesPage,
+    DocumentCreate,
+    DocumentRead,
+    DocumentUpdate,
+)
 
-__all__ = ["DocumentCreate", "DocumentRead", "DocumentUpdate"]
+__all__ = [
+    "DocumentChange",
+    "DocumentChangesPage",
+    "DocumentCreate",
+    "DocumentRead",
+    "DocumentUpdate",
+]
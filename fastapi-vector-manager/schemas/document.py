@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, ConfigDict
@@ -26,5 +27,20 @@ class DocumentUpdate(BaseModel):
 class DocumentRead(DocumentBase):
     id: int
     embedding: List[float]
+    version: int
+    updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class DocumentChange(BaseModel):
+    version: int
+    document_id: int
+    deleted: bool
+    document: Optional[DocumentRead] = None
+
+
+class DocumentChangesPage(BaseModel):
+    changes: List[DocumentChange]
+    next_cursor: int
+    has_more: bool
@@ -1,3 +1,12 @@
-from .embeddings import embed_text
+from .embedding_client import EmbeddingClient, embed_text, embed_texts, get_embedding_client
+from .embeddings import EmbeddingProvider, RetryableEmbeddingError, get_embedding_provider
 
-__all__ = ["embed_text"]
+__all__ = [
+    "EmbeddingClient",
+    "EmbeddingProvider",
+    "RetryableEmbeddingError",
+    "embed_text",
+    "embed_texts",
+    "get_embedding_client",
+    "get_embedding_provider",
+]
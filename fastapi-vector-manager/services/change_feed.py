@@ -0,0 +1,168 @@
+"""Incremental change feed over documents and their tombstones.
+
+Every write takes a transaction-scoped advisory lock before it draws a value
+from ``documents_version_seq``. Writers therefore commit in version order, so a
+reader that has seen version N can never later miss a change below N.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List, Set
+
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from sqlalchemy import select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from database import Document, DocumentTombstone, settings
+from schemas import DocumentChange, DocumentChangesPage, DocumentRead
+
+CHANGE_CHANNEL = "document_changes"
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+_CHANGE_FEED_LOCK_KEY = 0x646F6373
+
+
+def lock_change_feed(db: Session) -> None:
+    """Serialize document writers until the current transaction ends."""
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CHANGE_FEED_LOCK_KEY})
+
+
+def load_changes(db: Session, since: int, limit: int) -> DocumentChangesPage:
+    """Return up to ``limit`` changes with a version greater than ``since``."""
+    documents = db.scalars(
+        select(Document)
+        .where(Document.version > since)
+        .order_by(Document.version)
+        .limit(limit + 1)
+    ).all()
+    tombstones = db.scalars(
+        select(DocumentTombstone)
+        .where(DocumentTombstone.version > since)
+        .order_by(DocumentTombstone.version)
+        .limit(limit + 1)
+    ).all()
+
+    changes: List[DocumentChange] = [
+        DocumentChange(
+            version=document.version,
+            document_id=document.id,
+            deleted=False,
+            document=DocumentRead.model_validate(document),
+        )
+        for document in documents
+    ]
+    changes.extend(
+        DocumentChange(
+            version=tombstone.version,
+            document_id=tombstone.document_id,
+            deleted=True,
+        )
+        for tombstone in tombstones
+    )
+    changes.sort(key=lambda change: change.version)
+
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    next_cursor = changes[-1].version if changes else since
+    return DocumentChangesPage(changes=changes, next_cursor=next_cursor, has_more=has_more)
+
+
+class ChangeStreamLimitError(RuntimeError):
+    """Raised when ``CHANGE_STREAM_MAX_CLIENTS`` streams are already open."""
+
+
+class ChangeNotificationHub:
+    """One LISTEN connection per process, fanned out to per-stream events.
+
+    The connection lives outside the pool because it is held for as long as
+    any stream is open. Its socket is watched with ``loop.add_reader``, so idle
+    streams wait on an ``asyncio.Event`` without holding a worker thread.
+    """
+
+    def __init__(self, max_subscribers: int) -> None:
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[asyncio.Event] = set()
+        self._connection = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._connect_lock = asyncio.Lock()
+
+    @property
+    def full(self) -> bool:
+        return len(self._subscribers) >= self.max_subscribers
+
+    async def subscribe(self) -> asyncio.Event:
+        """Register a stream; LISTEN is active once this returns."""
+        if self.full:
+            raise ChangeStreamLimitError("Too many open change streams")
+        event = asyncio.Event()
+        self._subscribers.add(event)
+        try:
+            await self._ensure_listening()
+        except BaseException:
+            self.unsubscribe(event)
+            raise
+        return event
+
+    def unsubscribe(self, event: asyncio.Event) -> None:
+        self._subscribers.discard(event)
+        if not self._subscribers:
+            self.close()
+
+    async def wait(self, event: asyncio.Event, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds; return whether any change was announced."""
+        # Reconnects here if the LISTEN connection dropped since the last wait.
+        await self._ensure_listening()
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        event.clear()
+        return True
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self._connection.fileno())
+        self._connection.close()
+        self._connection = None
+        self._loop = None
+
+    async def _ensure_listening(self) -> None:
+        async with self._connect_lock:
+            if self._connection is not None:
+                return
+            connection = await asyncio.to_thread(_connect_listener)
+            self._loop = asyncio.get_running_loop()
+            self._loop.add_reader(connection.fileno(), self._on_readable)
+            self._connection = connection
+
+    def _on_readable(self) -> None:
+        try:
+            self._connection.poll()
+        except psycopg2.Error:
+            # Lost connection: wake every stream so it re-reads and reconnects.
+            self.close()
+            self._notify_all()
+            return
+        if self._connection.notifies:
+            self._connection.notifies.clear()
+            self._notify_all()
+
+    def _notify_all(self) -> None:
+        for event in self._subscribers:
+            event.set()
+
+
+def _connect_listener():
+    dsn = make_url(settings.database_url).set(drivername="postgresql")
+    connection = psycopg2.connect(dsn.render_as_string(hide_password=False))
+    connection.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    with connection.cursor() as cursor:
+        cursor.execute(f"LISTEN {CHANGE_CHANNEL}")
+    return connection
+
+
+change_hub = ChangeNotificationHub(settings.change_stream_max_clients)
@@ -0,0 +1,398 @@
+"""Bulk export/import of the document corpus.
+
+Exports stream rows through a server-side cursor into Parquet, Arrow IPC or
+``.npy`` files (embeddings as float32, memory-mappable with ``np.load(...,
+mmap_mode="r")``). Imports bulk-load Parquet/Arrow through binary ``COPY`` into
+a staging table and upsert into ``documents``.
+
+Parquet and Arrow support needs the optional ``pyarrow`` package.
+
+Run ``python -m services.corpus export|import`` for offline bulk moves.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import struct
+from pathlib import Path
+from typing import Any, BinaryIO, Iterator, List, Literal, Sequence, Tuple
+
+import numpy as np
+import psycopg2
+from sqlalchemy import Row, func, select, text
+from sqlalchemy.orm import Session
+
+from database import Document, SessionLocal
+
+from .change_feed import lock_change_feed
+
+ArrowFormat = Literal["parquet", "arrow"]
+
+EXPORT_BATCH_SIZE = 10_000
+EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+_EXPORT_COLUMNS = (
+    Document.id,
+    Document.title,
+    Document.content,
+    Document.metadata_json,
+    Document.embedding,
+)
+_REQUIRED_IMPORT_COLUMNS = ("id", "content", "embedding")
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)
+_COPY_TRAILER = struct.pack(">h", -1)
+_COPY_FIELD_COUNT = struct.pack(">h", 5)
+_COPY_NULL = struct.pack(">i", -1)
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.compute  # noqa: F401 registers pyarrow.compute
+        import pyarrow.parquet  # noqa: F401 registers pyarrow.parquet
+    except ImportError as exc:
+        raise RuntimeError("Parquet/Arrow export and import require pyarrow") from exc
+    return pyarrow
+
+
+def _iter_row_batches(db: Session, batch_size: int) -> Iterator[Sequence[Row]]:
+    # yield_per streams through a server-side cursor instead of buffering the table.
+    result = db.execute(
+        select(*_EXPORT_COLUMNS)
+        .order_by(Document.id)
+        .execution_options(yield_per=batch_size)
+    )
+    yield from result.partitions()
+
+
+def _arrow_schema(pa):
+    return pa.schema(
+        [
+            pa.field("id", pa.int64(), nullable=False),
+            pa.field("title", pa.string()),
+            pa.field("content", pa.string(), nullable=False),
+            # Arbitrary JSON has no fixed Arrow type, so metadata travels as JSON text.
+            pa.field("metadata", pa.string()),
+            pa.field(
+                "embedding",
+                pa.list_(pa.float32(), Document.embedding.type.dim),
+                nullable=False,
+            ),
+        ]
+    )
+
+
+def _record_batch(pa, schema, rows: Sequence[Row]):
+    embeddings = np.stack([row.embedding for row in rows]).astype(np.float32, copy=False)
+    return pa.record_batch(
+        [
+            pa.array([row.id for row in rows], type=pa.int64()),
+            pa.array([row.title for row in rows], type=pa.string()),
+            pa.array([row.content for row in rows], type=pa.string()),
+            pa.array(
+                [
+                    None if row.metadata_json is None else json.dumps(row.metadata_json)
+                    for row in rows
+                ],
+                type=pa.string(),
+            ),
+            pa.FixedSizeListArray.from_arrays(
+                pa.array(embeddings.ravel(), type=pa.float32()),
+                Document.embedding.type.dim,
+            ),
+        ],
+        schema=schema,
+    )
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose buffered bytes can be drained between batches."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _open_arrow_writer(pa, sink, schema, export_format: ArrowFormat):
+    if export_format == "parquet":
+        return pa.parquet.ParquetWriter(sink, schema, compression="zstd")
+    return pa.ipc.new_stream(sink, schema)
+
+
+def write_arrow_export(db: Session, destination: BinaryIO | str, export_format: ArrowFormat) -> int:
+    """Write every document to ``destination``; returns the number of rows."""
+    pa = _require_pyarrow()
+    schema = _arrow_schema(pa)
+    count = 0
+    writer = _open_arrow_writer(pa, destination, schema, export_format)
+    try:
+        for rows in _iter_row_batches(db, EXPORT_BATCH_SIZE):
+            writer.write_batch(_record_batch(pa, schema, rows))
+            count += len(rows)
+    finally:
+        writer.close()
+    return count
+
+
+def stream_arrow_export(export_format: ArrowFormat) -> Iterator[bytes]:
+    """Return an iterator over an export file, batch by batch, for streaming responses.
+
+    pyarrow is checked eagerly so a missing dependency fails before any bytes are sent.
+    """
+    return _arrow_export_chunks(_require_pyarrow(), export_format)
+
+
+def _arrow_export_chunks(pa, export_format: ArrowFormat) -> Iterator[bytes]:
+    # Opens its own session because the response body outlives request dependencies.
+    schema = _arrow_schema(pa)
+    sink = _ChunkSink()
+    with SessionLocal(info={"read_only": True}) as db:
+        writer = _open_arrow_writer(pa, sink, schema, export_format)
+        try:
+            for rows in _iter_row_batches(db, EXPORT_BATCH_SIZE):
+                writer.write_batch(_record_batch(pa, schema, rows))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+    yield sink.drain()
+
+
+def export_npy(db: Session, directory: Path) -> int:
+    """Write ``embeddings.npy`` (float32, N x dim), ``ids.npy`` (int64) and a manifest.
+
+    Both arrays are filled through ``open_memmap`` so memory stays flat, and
+    can be opened with ``np.load(path, mmap_mode="r")``.
+    """
+    # One snapshot for the count and the scan so the arrays line up exactly.
+    db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    count = db.scalar(select(func.count()).select_from(Document)) or 0
+    dimension = Document.embedding.type.dim
+
+    directory.mkdir(parents=True, exist_ok=True)
+    embeddings = np.lib.format.open_memmap(
+        directory / "embeddings.npy", mode="w+", dtype=np.float32, shape=(count, dimension)
+    )
+    ids = np.lib.format.open_memmap(
+        directory / "ids.npy", mode="w+", dtype=np.int64, shape=(count,)
+    )
+    offset = 0
+    for rows in _iter_row_batches(db, EXPORT_BATCH_SIZE):
+        end = offset + len(rows)
+        embeddings[offset:end] = np.stack([row.embedding for row in rows])
+        ids[offset:end] = [row.id for row in rows]
+        offset = end
+    embeddings.flush()
+    ids.flush()
+
+    manifest = {"count": count, "dimension": dimension, "dtype": "float32"}
+    (directory / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return count
+
+
+def _open_arrow_source(pa, source: BinaryIO | str, import_format: ArrowFormat) -> Tuple[Any, Iterator[Any]]:
+    """Return the file's schema and an iterator over its record batches."""
+    if import_format == "parquet":
+        parquet_file = pa.parquet.ParquetFile(source)
+        return parquet_file.schema_arrow, parquet_file.iter_batches(batch_size=EXPORT_BATCH_SIZE)
+    reader = pa.ipc.open_stream(source)
+    return reader.schema, iter(reader)
+
+
+def _check_import_schema(pa, schema, dimension: int) -> None:
+    missing = [name for name in _REQUIRED_IMPORT_COLUMNS if schema.get_field_index(name) == -1]
+    if missing:
+        raise ValueError(f"Import is missing required columns: {', '.join(missing)}")
+    if not pa.types.is_integer(schema.field("id").type):
+        raise ValueError("id must be an integer column")
+    embedding_type = schema.field("embedding").type
+    is_list = (
+        pa.types.is_list(embedding_type)
+        or pa.types.is_large_list(embedding_type)
+        or pa.types.is_fixed_size_list(embedding_type)
+    )
+    if not is_list or not pa.types.is_floating(embedding_type.value_type):
+        raise ValueError("embedding must be a list of floats")
+    if pa.types.is_fixed_size_list(embedding_type) and embedding_type.list_size != dimension:
+        raise ValueError(
+            f"Import has {embedding_type.list_size}-dimensional embeddings, expected {dimension}"
+        )
+
+
+def _optional_column(pa, batch, name: str) -> List[str | None]:
+    if batch.schema.get_field_index(name) == -1:
+        return [None] * batch.num_rows
+    return batch.column(name).cast(pa.string()).to_pylist()
+
+
+def _text_field(value: str | None) -> bytes:
+    if value is None:
+        return _COPY_NULL
+    encoded = value.encode("utf-8")
+    return struct.pack(">i", len(encoded)) + encoded
+
+
+def _copy_payload(pa, batch, dimension: int) -> bytes:
+    """Encode a record batch in PostgreSQL's binary COPY format.
+
+    Raises ``ValueError`` for rows the documents table would reject.
+    """
+    for name in _REQUIRED_IMPORT_COLUMNS:
+        if batch.column(name).null_count:
+            raise ValueError(f"{name} must not be null")
+
+    embedding_column = batch.column("embedding")
+    # Variable-size lists (pandas/polars Parquet) are accepted if every row has the right length.
+    if not pa.types.is_fixed_size_list(embedding_column.type):
+        lengths = pa.compute.min_max(pa.compute.list_value_length(embedding_column))
+        if lengths["min"].as_py() != dimension or lengths["max"].as_py() != dimension:
+            raise ValueError(f"Every embedding must have {dimension} values")
+    # pgvector's binary format: int16 dimension, int16 unused, big-endian float32s.
+    embeddings = (
+        embedding_column.flatten().to_numpy(zero_copy_only=False)
+        .astype(">f4")
+        .reshape(-1, dimension)
+    )
+    vector_header = struct.pack(">ihh", 4 + 4 * dimension, dimension, 0)
+
+    parts: List[bytes] = []
+    # A safe cast raises ArrowInvalid (a ValueError) for ids beyond int32.
+    ids = batch.column("id").cast(pa.int32()).to_pylist()
+    titles = _optional_column(pa, batch, "title")
+    contents = batch.column("content").cast(pa.string()).to_pylist()
+    metadata = _optional_column(pa, batch, "metadata")
+    for index, document_id in enumerate(ids):
+        parts.append(_COPY_FIELD_COUNT)
+        parts.append(struct.pack(">ii", 4, document_id))
+        parts.append(_text_field(titles[index]))
+        parts.append(_text_field(contents[index]))
+        parts.append(_text_field(metadata[index]))
+        parts.append(vector_header)
+        parts.append(embeddings[index].tobytes())
+    return b"".join(parts)
+
+
+def import_documents(db: Session, source: BinaryIO | str, import_format: ArrowFormat) -> int:
+    """Upsert documents from a Parquet/Arrow export; returns the number of rows loaded.
+
+    Rows are bulk-loaded with binary COPY into a temporary table, then merged
+    into ``documents`` by id. Updated and inserted rows get new change-feed
+    versions, and tombstones for re-imported ids are cleared.
+    """
+    pa = _require_pyarrow()
+    dimension = Document.embedding.type.dim
+    schema, batches = _open_arrow_source(pa, source, import_format)
+    _check_import_schema(pa, schema, dimension)
+
+    lock_change_feed(db)
+    db.execute(
+        text(
+            "CREATE TEMP TABLE documents_import "
+            "(id integer, title varchar, content text, metadata json, "
+            f"embedding vector({dimension})) ON COMMIT DROP"
+        )
+    )
+
+    raw_connection = db.connection().connection.driver_connection
+    count = 0
+    with raw_connection.cursor() as cursor:
+        for batch in batches:
+            if batch.num_rows == 0:
+                continue
+            payload = _COPY_HEADER + _copy_payload(pa, batch, dimension) + _COPY_TRAILER
+            try:
+                cursor.copy_expert(
+                    "COPY documents_import (id, title, content, metadata, embedding) "
+                    "FROM STDIN WITH (FORMAT binary)",
+                    io.BytesIO(payload),
+                )
+            except psycopg2.DataError as exc:
+                # e.g. metadata that is not valid JSON, or NaN embedding values.
+                raise ValueError(f"Import rejected by the database: {exc}") from exc
+            count += batch.num_rows
+
+    # ON CONFLICT DO UPDATE cannot touch a row twice, so reject repeated ids up front.
+    duplicate_id = db.scalar(
+        text("SELECT id FROM documents_import GROUP BY id HAVING count(*) > 1 LIMIT 1")
+    )
+    if duplicate_id is not None:
+        raise ValueError(f"Import contains document id {duplicate_id} more than once")
+
+    db.execute(
+        text(
+            "INSERT INTO documents (id, title, content, metadata, embedding) "
+            "SELECT id, title, content, metadata, embedding FROM documents_import "
+            "ON CONFLICT (id) DO UPDATE SET "
+            "title = EXCLUDED.title, content = EXCLUDED.content, "
+            "metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding, "
+            "version = nextval('documents_version_seq'), "
+            "updated_at = timezone('utc', now())"
+        )
+    )
+    db.execute(
+        text(
+            "DELETE FROM document_tombstones "
+            "WHERE document_id IN (SELECT id FROM documents_import)"
+        )
+    )
+    # Explicit ids bypass the serial sequence; move it past the imported range.
+    db.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence('documents', 'id'), "
+            "GREATEST((SELECT max(id) FROM documents), 1))"
+        )
+    )
+    db.commit()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bulk export/import of the document corpus")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export_parser = subcommands.add_parser("export")
+    export_parser.add_argument("--format", choices=["parquet", "arrow", "npy"], default="parquet")
+    export_parser.add_argument(
+        "--output", type=Path, required=True, help="File, or directory for npy exports"
+    )
+    import_parser = subcommands.add_parser("import")
+    import_parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    import_parser.add_argument("--input", type=Path, required=True)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        if args.command == "import":
+            count = import_documents(db, str(args.input), args.format)
+            print(f"Imported {count} documents from {args.input}")
+        elif args.format == "npy":
+            count = export_npy(db, args.output)
+            print(f"Exported {count} documents to {args.output}")
+        else:
+            count = write_arrow_export(db, str(args.output), args.format)
+            print(f"Exported {count} documents to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""Shared, flow-controlled client in front of the configured embedding provider.
+
+Every embedding request goes through one process-wide client that:
+
+* paces calls with a token bucket (``EMBEDDING_RATE_LIMIT_PER_SECOND``),
+* caps concurrent provider calls (``EMBEDDING_MAX_IN_FLIGHT``),
+* retries ``RetryableEmbeddingError`` with jittered exponential backoff,
+* coalesces identical texts that are already being embedded, and
+* optionally hedges a slow call with a second one (``EMBEDDING_HEDGE_AFTER_MS``).
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, TypeVar
+
+from database import settings
+
+from .embeddings import EmbeddingProvider, RetryableEmbeddingError, get_embedding_provider
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``acquire`` blocks until a token is available."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_seconds = (1 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+    def try_acquire(self) -> bool:
+        """Take a token only if one is available right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class EmbeddingClient:
+    def __init__(
+        self,
+        provider: EmbeddingProvider,
+        *,
+        rate_limit_per_second: float | None,
+        rate_limit_burst: int,
+        max_in_flight: int,
+        max_retries: int,
+        backoff_base_seconds: float,
+        backoff_max_seconds: float,
+        hedge_after_seconds: float | None,
+    ) -> None:
+        self.provider = provider
+        self._bucket = (
+            TokenBucket(rate_limit_per_second, rate_limit_burst)
+            if rate_limit_per_second
+            else None
+        )
+        self._semaphore = threading.BoundedSemaphore(max_in_flight)
+        self._max_retries = max_retries
+        self._backoff_base = backoff_base_seconds
+        self._backoff_max = backoff_max_seconds
+        self._hedge_after = hedge_after_seconds
+        self._hedge_executor = (
+            ThreadPoolExecutor(
+                max_workers=max_in_flight * 2, thread_name_prefix="embedding-hedge"
+            )
+            if hedge_after_seconds is not None
+            else None
+        )
+        self._in_flight: Dict[str, Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+    def embed(self, text: str) -> List[float]:
+        with self._in_flight_lock:
+            pending = self._in_flight.get(text)
+            if pending is None:
+                pending = Future()
+                self._in_flight[text] = pending
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            return pending.result()
+
+        try:
+            result = self._with_retries(lambda: self._hedged(text))
+        except BaseException as exc:
+            pending.set_exception(exc)
+            raise
+        else:
+            pending.set_result(result)
+            return result
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(text, None)
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        return self._with_retries(lambda: self._call(self.provider.embed_batch, texts))
+
+    def _call(
+        self, func: Callable[..., T], *args, started: threading.Event | None = None
+    ) -> T:
+        if self._bucket is not None:
+            self._bucket.acquire()
+        with self._semaphore:
+            if started is not None:
+                started.set()
+            return func(*args)
+
+    def _try_reserve(self) -> bool:
+        """Take a slot and a token without waiting; hedges never queue behind first attempts."""
+        if not self._semaphore.acquire(blocking=False):
+            return False
+        if self._bucket is not None and not self._bucket.try_acquire():
+            self._semaphore.release()
+            return False
+        return True
+
+    def _call_reserved(self, func: Callable[..., T], *args) -> T:
+        try:
+            return func(*args)
+        finally:
+            self._semaphore.release()
+
+    def _hedged(self, text: str) -> List[float]:
+        if self._hedge_executor is None:
+            return self._call(self.provider.embed, text)
+
+        started = threading.Event()
+        primary = self._hedge_executor.submit(
+            self._call, self.provider.embed, text, started=started
+        )
+        # Time only the provider call: local queueing for a token or slot is not
+        # provider slowness, and a hedge would just queue behind it too.
+        started.wait()
+        done, _ = wait([primary], timeout=self._hedge_after)
+        if done or not self._try_reserve():
+            return primary.result()
+
+        hedge = self._hedge_executor.submit(self._call_reserved, self.provider.embed, text)
+        error: BaseException | None = None
+        for future in as_completed([primary, hedge]):
+            try:
+                return future.result()
+            except Exception as exc:  # fall through to the other attempt
+                error = exc
+        assert error is not None
+        raise error
+
+    def _with_retries(self, attempt: Callable[[], T]) -> T:
+        for retry in range(self._max_retries + 1):
+            try:
+                return attempt()
+            except RetryableEmbeddingError as exc:
+                if retry == self._max_retries:
+                    raise RuntimeError(
+                        f"Embedding service unavailable after {retry + 1} attempts: {exc}"
+                    ) from exc
+                delay = min(self._backoff_max, self._backoff_base * 2**retry)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        raise AssertionError("unreachable")
+
+
+@lru_cache(maxsize=1)
+def get_embedding_client() -> EmbeddingClient:
+    hedge_after_ms = settings.embedding_hedge_after_ms
+    return EmbeddingClient(
+        get_embedding_provider(),
+        rate_limit_per_second=settings.embedding_rate_limit_per_second,
+        rate_limit_burst=settings.embedding_rate_limit_burst,
+        max_in_flight=settings.embedding_max_in_flight,
+        max_retries=settings.embedding_max_retries,
+        backoff_base_seconds=settings.embedding_backoff_base_seconds,
+        backoff_max_seconds=settings.embedding_backoff_max_seconds,
+        hedge_after_seconds=hedge_after_ms / 1000 if hedge_after_ms is not None else None,
+    )
+
+
+def embed_texts(texts: Sequence[str]) -> List[List[float]]:
+    return get_embedding_client().embed_batch(texts)
+
+
+def embed_text(text: str) -> List[float]:
+    return get_embedding_client().embed(text)
@@ -1,23 +1,155 @@
-from typing import List
+"""Embedding providers selected via ``Settings.embedding_provider``.
 
-import google.generativeai as genai
+* ``gemini`` – Google Gemini embeddings API (the default).
+* ``local`` – a sentence-transformers model loaded once and run on CPU, with
+  batches dispatched to a small thread pool.
+* ``hash`` – deterministic, network-free vectors derived from the text hash,
+  for load tests, benchmarks and offline development.
+"""
 
-from database import settings
+from __future__ import annotations
 
+import hashlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Sequence
 
-def _configure_client() -> None:
-    if not settings.gemini_api_key:
-        raise RuntimeError("GEMINI_API_KEY is not configured")
-    genai.configure(api_key=settings.gemini_api_key)
+import numpy as np
 
+from database import Document, settings
 
-def embed_text(text: str) -> List[float]:
-    _configure_client()
-    response = genai.embed_content(
-        model="models/text-embedding-004",
-        content=text,
-    )
-    embedding = response.get("embedding")
-    if embedding is None:
-        raise RuntimeError("Embedding service did not return an embedding vector")
-    return embedding
+
+class RetryableEmbeddingError(RuntimeError):
+    """Transient provider failure (quota, overload, timeout) worth retrying."""
+
+
+class EmbeddingProvider(ABC):
+    """Turns text into fixed-size embedding vectors."""
+
+    dimension: int
+
+    @abstractmethod
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` and return one vector per input, in order."""
+
+    def embed(self, text: str) -> List[float]:
+        return self.embed_batch([text])[0]
+
+
+class GeminiEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, api_key: str | None, model: str, dimension: int) -> None:
+        if not api_key:
+            raise RuntimeError("GEMINI_API_KEY is not configured")
+        # Imported here so workers that never embed don't pay for the SDK import.
+        import google.generativeai as genai
+        from google.api_core import exceptions as google_exceptions
+
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._retryable_errors = (
+            google_exceptions.TooManyRequests,
+            google_exceptions.ResourceExhausted,
+            google_exceptions.ServiceUnavailable,
+            google_exceptions.DeadlineExceeded,
+            google_exceptions.InternalServerError,
+        )
+        self.model = model
+        self.dimension = dimension
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        try:
+            response = self._genai.embed_content(model=self.model, content=list(texts))
+        except self._retryable_errors as exc:
+            raise RetryableEmbeddingError(str(exc)) from exc
+        embeddings = response.get("embedding")
+        if embeddings is None:
+            raise RuntimeError("Embedding service did not return an embedding vector")
+        return embeddings
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    def __init__(
+        self,
+        model_name: str,
+        *,
+        backend: str,
+        batch_size: int,
+        max_workers: int,
+    ) -> None:
+        try:
+            from sentence_transformers import SentenceTransformer
+        except ImportError as exc:
+            raise RuntimeError(
+                "EMBEDDING_PROVIDER=local requires the sentence-transformers package"
+            ) from exc
+
+        self._model = SentenceTransformer(model_name, device="cpu", backend=backend)
+        self.dimension = self._model.get_sentence_embedding_dimension()
+        self._batch_size = batch_size
+        # Inference releases the GIL, so a few workers keep concurrent requests flowing.
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="local-embedding"
+        )
+
+    def _encode(self, texts: Sequence[str]) -> List[List[float]]:
+        vectors = self._model.encode(
+            list(texts),
+            batch_size=self._batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+        )
+        return vectors.astype(np.float32).tolist()
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        chunks = [
+            texts[start : start + self._batch_size]
+            for start in range(0, len(texts), self._batch_size)
+        ]
+        embeddings: List[List[float]] = []
+        for result in self._executor.map(self._encode, chunks):
+            embeddings.extend(result)
+        return embeddings
+
+
+class HashEmbeddingProvider(EmbeddingProvider):
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+
+    def embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def _vector(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        rng = np.random.default_rng(int.from_bytes(digest[:8], "big"))
+        vector = rng.standard_normal(self.dimension)
+        vector /= np.linalg.norm(vector)
+        return vector.astype(np.float32).tolist()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_provider() -> EmbeddingProvider:
+    """Build the configured provider once per process."""
+    if settings.embedding_provider == "local":
+        provider: EmbeddingProvider = LocalEmbeddingProvider(
+            settings.local_embedding_model,
+            backend=settings.local_embedding_backend,
+            batch_size=settings.embedding_batch_size,
+            max_workers=settings.embedding_workers,
+        )
+    elif settings.embedding_provider == "hash":
+        provider = HashEmbeddingProvider(settings.embedding_dimension)
+    else:
+        provider = GeminiEmbeddingProvider(
+            settings.gemini_api_key,
+            settings.embedding_model,
+            settings.embedding_dimension,
+        )
+
+    column_dimension = Document.embedding.type.dim
+    if provider.dimension != column_dimension:
+        raise RuntimeError(
+            f"Embedding provider produces {provider.dimension}-dimensional vectors "
+            f"but the documents table expects {column_dimension}"
+        )
+    return provider
@@ -0,0 +1,125 @@
+"""Request timing, Prometheus histograms and optional OpenTelemetry spans."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from database import settings
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+OPERATION_LATENCY = Histogram(
+    "operation_duration_seconds",
+    "Latency of instrumented internal operations.",
+    ["operation"],
+)
+STARTUP_DURATION = Gauge(
+    "app_startup_duration_seconds",
+    "Time spent in each cold-start phase of this worker.",
+    ["phase"],
+)
+
+_tracer = None
+if settings.otel_enabled:
+    try:
+        from opentelemetry import trace
+    except ImportError as exc:  # pragma: no cover - depends on deployment extras
+        raise RuntimeError(
+            "OTEL_ENABLED is set but opentelemetry-api is not installed"
+        ) from exc
+    _tracer = trace.get_tracer("vector-manager")
+
+
+@contextmanager
+def timed(operation: str) -> Iterator[None]:
+    """Record the wrapped block in ``operation_duration_seconds`` (and a span)."""
+    if not settings.metrics_enabled:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        if _tracer is None:
+            yield
+        else:
+            with _tracer.start_as_current_span(operation):
+                yield
+    finally:
+        OPERATION_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so timing adds no extra task or body buffering."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template rather than raw path to keep cardinality bounded.
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(
+                scope["method"], route_path, str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info["query_start_time"].pop()
+    OPERATION_LATENCY.labels("db.execute").observe(time.perf_counter() - start)
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    # so it does not linger on the pooled connection.
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def metrics_endpoint() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def install_metrics(app: FastAPI) -> None:
+    """Attach request middleware, SQL timing listeners and the ``/metrics`` route."""
+    if not settings.metrics_enabled:
+        return
+
+    app.add_middleware(MetricsMiddleware)
+    # Listening on the Engine class covers the primary and any additional engines.
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    app.add_api_route(
+        "/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False
+    )